@@ -54,6 +54,9 @@ MODEL_PARAMS = {
                  "remodel_age",  # Remodel age (same as building_age if no remodeling): yrsold - yearremodadd
                  ],
     "TARGET": "saleprice",
+    "PRICE_BINS": 10,  # number of price quantile bins used to stratify splits
+    "TIME_COLUMNS": ["yrsold", "mosold"],  # sort keys of time-based splits, most significant first
+    "N_SPLITS": 5,  # number of cross-validation folds
 
 }
 
@@ -62,4 +65,7 @@ SEED=43
 
 ESTIMATORS=10
 
+# number of train rows used to infer the mlflow model signature
+SIGNATURE_SAMPLE_SIZE=100
+
 EXECUTION_DATE = pendulum.now(tz=TIMEZONE)
@@ -0,0 +1,260 @@
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from loguru import logger
+from scipy import sparse
+from sklearn.base import BaseEstimator, clone
+from sklearn.pipeline import Pipeline
+
+try:
+    from .trainer import eval_metrics
+    from .utils import DatasetSplit, select_features
+    from ..settings.params import MODEL_PARAMS
+except Exception:
+    from src.trainer import eval_metrics
+    from src.utils import DatasetSplit, select_features
+    from settings.params import MODEL_PARAMS
+
+
+# Dense array, or the "data", "indices", "indptr" arrays and "shape" of a CSR matrix
+SharedMatrix = Union[np.memmap, Dict[str, Union[np.memmap, Tuple[int, int]]]]
+
+
+def _save_array(array: np.ndarray, path: Path) -> np.memmap:
+    """ Save an array as .npy file and reopen it read-only as memory-mapped array """
+    np.save(path, array)
+    return np.load(path, mmap_mode="r")
+
+
+def _load_matrix(matrix: SharedMatrix) -> Union[np.memmap, sparse.csr_matrix]:
+    """ Rebuild a CSR matrix over its memory-mapped arrays, dense arrays are returned as is """
+    if isinstance(matrix, dict):
+        return sparse.csr_matrix((matrix["data"], matrix["indices"], matrix["indptr"]), shape=matrix["shape"])
+    return matrix
+
+
+def _dump_fold(preprocessor: BaseEstimator,
+               split: DatasetSplit,
+               folder: str,
+               prefix: str
+               ) -> Dict[str, SharedMatrix]:
+    """ Preprocess one fold and store its matrices as memory-mapped files
+
+    Sparse outputs (e.g. one-hot encoded features) stay sparse: the CSR arrays are stored separately.
+
+    Args:
+        preprocessor: unfitted preprocessing step, fitted on the train rows of the fold
+        split: train and validation rows of the fold
+        folder: directory of the .npy files
+        prefix: file name prefix of the fold
+
+    Returns:
+        Dict[str, SharedMatrix]: read-only "X_train", "y_train", "X_test" and "y_test" matrices
+    """
+    preprocessor = clone(preprocessor)
+    arrays = {"X_train": preprocessor.fit_transform(split.X_train),
+              "y_train": split.y_train,
+              "X_test": preprocessor.transform(split.X_test),
+              "y_test": split.y_test,
+              }
+
+    matrices = {}
+    for name, array in arrays.items():
+        if sparse.issparse(array):
+            array = sparse.csr_matrix(array)
+            matrices[name] = {"shape": array.shape,
+                              **{part: _save_array(getattr(array, part), Path(folder, f"{prefix}_{name}_{part}.npy"))
+                                 for part in ("data", "indices", "indptr")}}
+        else:
+            matrices[name] = _save_array(np.asarray(array, dtype=np.float64), Path(folder, f"{prefix}_{name}.npy"))
+    return matrices
+
+
+@contextmanager
+def _shared_fold_matrices(data: pd.DataFrame,
+                          candidates: Dict[str, Pipeline],
+                          folds: List[Tuple[np.ndarray, np.ndarray]],
+                          features: List[str],
+                          temp_folder: Optional[str] = None
+                          ) -> Iterator[Dict[str, List[Dict[str, SharedMatrix]]]]:
+    """ Preprocess every fold once and share the matrices through memory-mapped files
+
+    Candidates with the same preprocessing step share the same matrices.
+    The files are removed when leaving the context.
+
+    Yields:
+        Dict[str, List[Dict[str, SharedMatrix]]]: fold matrices by model name
+    """
+    folder = tempfile.mkdtemp(prefix="house_pricing_cv_", dir=temp_folder)
+    try:
+        matrices_by_preprocessor = {}
+        fold_matrices = {}
+        for model_name, pipeline in candidates.items():
+            preprocessor = pipeline.named_steps["preprocessor"]
+            key = joblib.hash(preprocessor)
+            if key not in matrices_by_preprocessor:
+                matrices_by_preprocessor[key] = [
+                    _dump_fold(preprocessor,
+                               DatasetSplit(data=data,
+                                            features=features,
+                                            target=MODEL_PARAMS["TARGET"],
+                                            train_index=train_index,
+                                            test_index=test_index),
+                               folder,
+                               prefix=f"{key}_{fold_id}")
+                    for fold_id, (train_index, test_index) in enumerate(folds)
+                ]
+            fold_matrices[model_name] = matrices_by_preprocessor[key]
+
+        logger.info(f"{len(matrices_by_preprocessor)} preprocessing(s) x {len(folds)} folds stored in {folder}")
+        yield fold_matrices
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def _start_worker() -> int:
+    """ Empty task importing this module in a worker, returns the worker pid """
+    return os.getpid()
+
+
+def _evaluate_fold(estimator: BaseEstimator,
+                   X_train: SharedMatrix,
+                   y_train: np.ndarray,
+                   X_test: SharedMatrix,
+                   y_test: np.ndarray
+                   ) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """ Fit a fresh copy of the estimator on one fold and compute its train and test metrics """
+    X_train, X_test = _load_matrix(X_train), _load_matrix(X_test)
+    estimator = clone(estimator).fit(X_train, y_train)
+    return (eval_metrics(y_train, estimator.predict(X_train)),
+            eval_metrics(y_test, estimator.predict(X_test)))
+
+
+def _evaluate_tasks(candidates: Dict[str, Pipeline],
+                    fold_matrices: Dict[str, List[Dict[str, SharedMatrix]]],
+                    n_jobs: int
+                    ) -> Dict[str, List[Tuple[Dict[str, float], Dict[str, float]]]]:
+    """ Evaluate every (model x fold) task in parallel
+
+    Workers only receive the unfitted estimator and references to the memory-mapped matrices.
+
+    Returns:
+        Dict[str, List[Tuple[Dict[str, float], Dict[str, float]]]]: train and test metrics of each fold by model name
+    """
+    tasks = [(model_name, matrices)
+             for model_name in candidates
+             for matrices in fold_matrices[model_name]]
+
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(candidates[model_name].named_steps["estimator"], **matrices)
+        for model_name, matrices in tasks
+    )
+
+    fold_results = {model_name: [] for model_name in candidates}
+    for (model_name, _), metrics in zip(tasks, results):
+        fold_results[model_name].append(metrics)
+    return fold_results
+
+
+def cross_validate_models(data: pd.DataFrame,
+                          candidates: Dict[str, Pipeline],
+                          folds: List[Tuple[np.ndarray, np.ndarray]],
+                          features: Optional[List[str]] = None,
+                          n_jobs: int = -1,
+                          temp_folder: Optional[str] = None
+                          ) -> Dict[str, Dict]:
+    """ Cross-validate candidate pipelines in parallel
+
+    The preprocessing step of each candidate is fitted once per fold, and the
+    resulting matrices are shared with the workers through memory-mapped files.
+
+    Args:
+        data: dataset containing the features and the target
+        candidates: pipelines by model name, as returned by define_pipeline
+        folds: train and validation row positions, as returned by make_folds
+        features: feature names, default is select_features(data)
+        n_jobs: number of parallel workers, -1 means all the cores
+        temp_folder: parent directory of the memory-mapped files, default is the system temp directory
+
+    Returns:
+        Dict[str, Dict]: by model name, the mean "train_metrics" and "test_metrics",
+            the "test_metrics_std" across folds and the per-fold "fold_metrics"
+    """
+    features = select_features(data) if features is None else features
+
+    with _shared_fold_matrices(data, candidates, folds, features, temp_folder) as fold_matrices:
+        fold_results = _evaluate_tasks(candidates, fold_matrices, n_jobs)
+
+    model_results = {}
+    for model_name, metrics in fold_results.items():
+        train_metrics = pd.DataFrame([train for train, _ in metrics])
+        test_metrics = pd.DataFrame([test for _, test in metrics])
+        model_results[model_name] = {
+            "train_metrics": train_metrics.mean().to_dict(),
+            "test_metrics": test_metrics.mean().to_dict(),
+            "test_metrics_std": test_metrics.std(ddof=0).to_dict(),
+            "fold_metrics": [{"train_metrics": train, "test_metrics": test} for train, test in metrics],
+        }
+        logger.info(f"Model: {model_name}")
+        logger.info(f"CV test mean: {model_results[model_name]['test_metrics']}")
+        logger.info(f"CV test std: {model_results[model_name]['test_metrics_std']}")
+
+    return model_results
+
+
+def benchmark_cross_validation(data: pd.DataFrame,
+                               candidates: Dict[str, Pipeline],
+                               folds: List[Tuple[np.ndarray, np.ndarray]],
+                               n_jobs_list: Optional[List[int]] = None,
+                               features: Optional[List[str]] = None,
+                               temp_folder: Optional[str] = None
+                               ) -> pd.DataFrame:
+    """ Measure how the (model x fold) evaluation scales with the number of cores
+
+    The fold matrices are preprocessed once and the workers are started beforehand,
+    only the parallel evaluation is timed.
+
+    Args:
+        data: dataset containing the features and the target
+        candidates: pipelines by model name, as returned by define_pipeline
+        folds: train and validation row positions, as returned by make_folds
+        n_jobs_list: numbers of workers to time, default is 1 to joblib.cpu_count().
+            A sequential run is added first when missing, as reference of the speedup
+        features: feature names, default is select_features(data)
+        temp_folder: parent directory of the memory-mapped files, default is the system temp directory
+
+    Returns:
+        pd.DataFrame: "n_jobs", "workers" (effective number of workers), "seconds",
+            "speedup" (sequential time / time) and "efficiency" (speedup / workers) of each run
+    """
+    features = select_features(data) if features is None else features
+    n_jobs_list = list(range(1, joblib.cpu_count() + 1) if n_jobs_list is None else n_jobs_list)
+    if 1 not in [joblib.effective_n_jobs(n_jobs) for n_jobs in n_jobs_list]:
+        n_jobs_list = [1] + n_jobs_list
+
+    timings = []
+    with _shared_fold_matrices(data, candidates, folds, features, temp_folder) as fold_matrices:
+        for n_jobs in n_jobs_list:
+            # Start the workers and their imports outside of the timed evaluation
+            Parallel(n_jobs=n_jobs)(delayed(_start_worker)() for _ in range(joblib.effective_n_jobs(n_jobs)))
+            start = time.perf_counter()
+            _evaluate_tasks(candidates, fold_matrices, n_jobs)
+            timings.append({"n_jobs": n_jobs,
+                            "workers": joblib.effective_n_jobs(n_jobs),
+                            "seconds": time.perf_counter() - start})
+            logger.info(f"n_jobs: {n_jobs} - {timings[-1]['seconds']:.2f}s")
+
+    benchmark = pd.DataFrame(timings)
+    sequential_seconds = benchmark.loc[benchmark["workers"] == 1, "seconds"].iloc[0]
+    benchmark["speedup"] = sequential_seconds / benchmark["seconds"]
+    benchmark["efficiency"] = benchmark["speedup"] / benchmark["workers"]
+    return benchmark
@@ -21,9 +21,9 @@ from mlflow.models import infer_signature
 
 
 try:
-    from ..settings.params import ESTIMATORS, EXECUTION_DATE
+    from ..settings.params import ESTIMATORS, EXECUTION_DATE, SIGNATURE_SAMPLE_SIZE
 except Exception:
-    from settings.params import ESTIMATORS, EXECUTION_DATE
+    from settings.params import ESTIMATORS, EXECUTION_DATE, SIGNATURE_SAMPLE_SIZE
 
 
 
@@ -98,6 +98,31 @@ def define_pipeline(numerical_transformer: list,
     return model_pipeline
 
 
+def define_candidates(target_transformer) -> Dict[str, Pipeline]:
+    """ Define the candidate pipelines compared during training
+
+    Args:
+        target_transformer: if True, the target is log-transformed before fitting
+
+    Returns:
+        Dict[str, Pipeline]: sklearn pipelines by model name
+    """
+    models = {
+        "LinearRegression": LinearRegression(),
+        "RandomForest": RandomForestRegressor(n_estimators=ESTIMATORS),
+        "GradientBoosting": GradientBoostingRegressor(n_estimators=ESTIMATORS)
+    }
+
+    return {model_name: define_pipeline(numerical_transformer=[SimpleImputer(strategy="median"),
+                                                               RobustScaler()],
+                                        categorical_transformer=[SimpleImputer(strategy="constant", fill_value="undefined"),
+                                                                 OneHotEncoder(drop="if_binary", handle_unknown="ignore")],
+                                        target_transformer=target_transformer,
+                                        estimator=model
+                                        )
+            for model_name, model in models.items()}
+
+
 # TODO : écrire le docstring
 
 def train_models(
@@ -113,16 +138,12 @@ def train_models(
         target_transformer
         ):
     
-    models = {
-        "LinearRegression": LinearRegression(),
-        "RandomForest": RandomForestRegressor(n_estimators=ESTIMATORS),
-        "GradientBoosting": GradientBoostingRegressor(n_estimators=ESTIMATORS)
-    }
+    candidates = define_candidates(target_transformer)
 
     model_results = {}
 
 
-    for model_name, model in models.items():
+    for model_name, reg in candidates.items():
 
         with mlflow.start_run(
             run_name=f"{EXECUTION_DATE.strftime('%Y%m%d_%H%m%S')}-house_pricing",
@@ -130,15 +151,6 @@ def train_models(
             tags={"version": "v1", "priority": "P1"},
             description="house price modeling",) as mlf_run:
 
-            # Model definition
-            reg = define_pipeline(numerical_transformer=[SimpleImputer(strategy="median"),
-                                                        RobustScaler()],
-                                categorical_transformer=[SimpleImputer(strategy="constant", fill_value="undefined"),
-                                                        OneHotEncoder(drop="if_binary", handle_unknown="ignore")],
-                                target_transformer=target_transformer,
-                                estimator=model
-                            )
-
             reg.fit(X_train, y_train)
 
             # Evaluate Metrics
@@ -163,13 +175,14 @@ def train_models(
             mlflow.log_param("model_name", model_name)
 
             # Infer model signature
-            # Converting train features into a DataFrame
-            X_train_df = pd.DataFrame(data=X_train, columns=data.columns)
+            # Only the column types matter: a small sample avoids copying the whole train set
+            X_train_df = X_train.head(SIGNATURE_SAMPLE_SIZE).reindex(columns=data.columns)
 
             X_train_df.loc[:, categorical_features] = X_train_df.loc[:, categorical_features].astype(str)
             X_train_df.loc[:, numerical_features] = X_train_df.loc[:, numerical_features].astype(str)
 
-            signature = infer_signature(model_input=X_train_df,model_output=y_train_pred)
+            signature = infer_signature(model_input=X_train_df,
+                                        model_output=y_train_pred[:SIGNATURE_SAMPLE_SIZE])
 
 
             # Log parameter, metrics, and model to MLflow
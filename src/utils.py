@@ -1,12 +1,18 @@
+import numpy as np
 import pandas as pd
 import missingno as msno
 import dill
 import pickle
 
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 from loguru import logger
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import (train_test_split,
+                                     RepeatedKFold,
+                                     RepeatedStratifiedKFold,
+                                     TimeSeriesSplit,
+                                     )
 
 from sklearn.pipeline import make_pipeline, Pipeline
 from sklearn.impute import SimpleImputer
@@ -74,25 +80,263 @@ def remove_single_modality_categorical_variables(
     return filtered_data
 
 
+SPLIT_STRATEGIES = ("random", "stratified", "time")
+
+
+@dataclass(frozen=True, eq=False)
+class DatasetSplit:
+    """Train/test split described by row positions over a single backing frame.
+
+    No copy of the data is held: ``X_train``, ``X_test``, ``y_train`` and ``y_test``
+    are only materialized when accessed, with the ordered ``features`` as columns.
+
+    Args:
+        data (pd.DataFrame): backing dataset
+        features (List[str]): ordered feature names
+        target (str): target column name
+        train_index (np.ndarray): sorted row positions of the training set
+        test_index (np.ndarray): sorted row positions of the test set
+
+    Raises:
+        KeyError: if a feature is not a column of data
+    """
+
+    data: pd.DataFrame
+    features: List[str]
+    target: str
+    train_index: np.ndarray
+    test_index: np.ndarray
+    feature_positions: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        feature_positions = self.data.columns.get_indexer(self.features)
+        # get_indexer returns -1 for unknown columns, which iloc would read as the last column
+        missing_features = [feature for feature, position in zip(self.features, feature_positions) if position < 0]
+        if missing_features:
+            raise KeyError(f"Features not found in data: {missing_features}")
+        object.__setattr__(self, "feature_positions", feature_positions)
+
+    def features_at(self, index: np.ndarray) -> pd.DataFrame:
+        """Return the feature columns for the given row positions."""
+        return self.data.iloc[index, self.feature_positions]
+
+    def target_at(self, index: np.ndarray) -> pd.Series:
+        """Return the target values for the given row positions."""
+        return self.data[self.target].iloc[index]
+
+    @property
+    def X_train(self) -> pd.DataFrame:
+        return self.features_at(self.train_index)
+
+    @property
+    def X_test(self) -> pd.DataFrame:
+        return self.features_at(self.test_index)
+
+    @property
+    def y_train(self) -> pd.Series:
+        return self.target_at(self.train_index)
+
+    @property
+    def y_test(self) -> pd.Series:
+        return self.target_at(self.test_index)
+
+
+def select_features(
+        data: pd.DataFrame,
+        features: Optional[List[str]] = None
+        )-> List[str]:
+    """Select the model features available in the dataset.
+
+    Args:
+        data (Dataframe): dataset in which we select the features
+        features (Optional[List[str]]): candidate features, default is MODEL_PARAMS["FEATURES"]
+
+    Returns:
+        List[str]: features present in data, in the order of the candidate list
+
+    """
+
+    features = MODEL_PARAMS["FEATURES"] if features is None else features
+    return [feature for feature in features if feature in data.columns]
+
+
+def price_bins(
+        target: pd.Series,
+        n_bins: Optional[int] = None
+        )-> np.ndarray:
+    """Assign each row to a quantile bin of the target, used to stratify splits.
+
+    Args:
+        target (pd.Series): target values
+        n_bins (Optional[int]): number of bins, default is MODEL_PARAMS["PRICE_BINS"]
+
+    Returns:
+        np.ndarray: bin label of each row
+
+    """
+
+    n_bins = MODEL_PARAMS["PRICE_BINS"] if n_bins is None else n_bins
+    # ranking first keeps the bin edges unique when prices are tied
+    return pd.qcut(target.rank(method="first"), q=n_bins, labels=False).to_numpy()
+
+
+def time_order(
+        data: pd.DataFrame,
+        time_columns: Optional[List[str]] = None
+        )-> np.ndarray:
+    """Return the row positions sorted chronologically (stable sort).
+
+    Args:
+        data (Dataframe): dataset to sort
+        time_columns (Optional[List[str]]): sort keys, most significant first,
+            default is MODEL_PARAMS["TIME_COLUMNS"]
+
+    Returns:
+        np.ndarray: row positions from the oldest to the most recent sale
+
+    """
+
+    time_columns = MODEL_PARAMS["TIME_COLUMNS"] if time_columns is None else time_columns
+    # np.lexsort uses the last key as the primary one
+    return np.lexsort([data[column].to_numpy() for column in reversed(time_columns)])
+
+
+def split_indices(
+        data: pd.DataFrame,
+        strategy: str = "random",
+        test_size: Optional[float] = None,
+        random_state: Optional[int] = 23,
+        n_bins: Optional[int] = None,
+        time_columns: Optional[List[str]] = None
+        )-> Tuple[np.ndarray, np.ndarray]:
+    """Compute train/test row positions without copying the data.
+
+    Args:
+        data (Dataframe): dataset to split
+        strategy (str): "random", "stratified" (by price bin) or "time"
+            (the most recent sales are used as test set)
+        test_size (Optional[float]): default is MODEL_PARAMS["TEST_SIZE"]
+        random_state (Optional[int]): seed of the random and stratified strategies
+        n_bins (Optional[int]): number of price bins of the stratified strategy
+        time_columns (Optional[List[str]]): sort keys of the time strategy
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: sorted train and test row positions
+
+    """
+
+    test_size = MODEL_PARAMS["TEST_SIZE"] if test_size is None else test_size
+
+    if strategy == "time":
+        order = time_order(data, time_columns)
+        n_test = int(np.ceil(test_size * len(data)))
+        train_index, test_index = order[:len(data) - n_test], order[len(data) - n_test:]
+    elif strategy in ("random", "stratified"):
+        stratify = price_bins(data[MODEL_PARAMS["TARGET"]], n_bins) if strategy == "stratified" else None
+        train_index, test_index = train_test_split(
+            np.arange(len(data)),
+            test_size=test_size,
+            random_state=random_state,
+            stratify=stratify
+        )
+    else:
+        raise ValueError(f"Unrecognized split strategy: {strategy}")
+
+    return np.sort(train_index), np.sort(test_index)
+
+
+def make_folds(
+        data: pd.DataFrame,
+        strategy: str = "random",
+        n_splits: Optional[int] = None,
+        n_repeats: int = 1,
+        random_state: Optional[int] = 23,
+        n_bins: Optional[int] = None,
+        time_columns: Optional[List[str]] = None
+        )-> List[Tuple[np.ndarray, np.ndarray]]:
+    """Compute (repeated) cross-validation folds as row positions.
+
+    Args:
+        data (Dataframe): dataset to split
+        strategy (str): "random", "stratified" (by price bin) or "time"
+            (expanding window, each fold is validated on later sales)
+        n_splits (Optional[int]): number of folds, default is MODEL_PARAMS["N_SPLITS"]
+        n_repeats (int): number of repetitions with a different shuffling,
+            must be 1 for the time strategy
+        random_state (Optional[int]): seed of the random and stratified strategies
+        n_bins (Optional[int]): number of price bins of the stratified strategy
+        time_columns (Optional[List[str]]): sort keys of the time strategy
+
+    Returns:
+        List[Tuple[np.ndarray, np.ndarray]]: sorted train and validation row positions of each fold
+
+    """
+
+    n_splits = MODEL_PARAMS["N_SPLITS"] if n_splits is None else n_splits
+    positions = np.arange(len(data))
+
+    if strategy == "time":
+        if n_repeats != 1:
+            raise ValueError("Time-based folds cannot be repeated")
+        order = time_order(data, time_columns)
+        folds = [(order[train], order[test]) for train, test in TimeSeriesSplit(n_splits=n_splits).split(order)]
+    elif strategy == "random":
+        splitter = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+        folds = splitter.split(positions)
+    elif strategy == "stratified":
+        splitter = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+        folds = splitter.split(positions, price_bins(data[MODEL_PARAMS["TARGET"]], n_bins))
+    else:
+        raise ValueError(f"Unrecognized split strategy: {strategy}")
+
+    return [(np.sort(train), np.sort(test)) for train, test in folds]
+
+
+def make_split(
+        data: pd.DataFrame,
+        strategy: str = "random",
+        test_size: Optional[float] = None,
+        random_state: Optional[int] = 23,
+        **kwargs
+        )-> DatasetSplit:
+    """Split the dataset into lazy train/test views.
+
+    Args:
+        data (Dataframe): dataset to split
+        strategy (str): "random", "stratified" or "time", see split_indices
+        test_size (Optional[float]): default is MODEL_PARAMS["TEST_SIZE"]
+        random_state (Optional[int]): seed of the random and stratified strategies
+        **kwargs: n_bins or time_columns, see split_indices
+
+    Returns:
+        DatasetSplit: row positions and ordered features over data
+
+    """
+
+    train_index, test_index = split_indices(data, strategy, test_size, random_state, **kwargs)
+    return DatasetSplit(data=data,
+                        features=select_features(data),
+                        target=MODEL_PARAMS["TARGET"],
+                        train_index=train_index,
+                        test_index=test_index)
+
+
 def split_dataset(
         data: pd.DataFrame
-        )-> pd.DataFrame:
-    
-    # selected_features = data.columns.drop(MODEL_PARAMS["TARGET"])
+        )-> Tuple[pd.DataFrame, pd.DataFrame, pd.Series, pd.Series]:
+    """Split the dataset into train and test sets.
 
-    FEATURES = set(MODEL_PARAMS["FEATURES"])
-    data_columns = set(data.columns)
-    intersection_result = FEATURES.intersection(data_columns)
-    selected_columns_index = pd.Index(intersection_result, dtype='object')
+    Args:
+        data (Dataframe): dataset to split
 
+    Returns:
+        Tuple: X_train, X_test, y_train, y_test
+
+    """
+
+    split = make_split(data)
+    X_train, X_test, y_train, y_test = split.X_train, split.X_test, split.y_train, split.y_test
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        data[selected_columns_index],
-        data[MODEL_PARAMS["TARGET"]], 
-        test_size=MODEL_PARAMS["TEST_SIZE"],
-        random_state=23
-    )
-    
     logger.info(f"\nx train: {X_train.shape}\nY train: {y_train.shape} \n" f"X test: {X_test.shape}\nY test: {y_test.shape}")
     return X_train, X_test, y_train, y_test
 
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+import pytest
+from ..src.evaluator import cross_validate_models, benchmark_cross_validation, _shared_fold_matrices
+from ..src.trainer import define_candidates
+from ..src.utils import make_folds
+
+
+rng = np.random.default_rng(23)
+data = pd.DataFrame({"lotarea": rng.uniform(1000, 20000, 200),
+                     "overallqual": rng.integers(1, 10, 200),
+                     "street": rng.choice(["pave", "grvl"], 200),
+                     "yrsold": rng.integers(2006, 2011, 200),
+                     "mosold": rng.integers(1, 13, 200),
+                     })
+data["saleprice"] = 10 * data["lotarea"] + 20000 * data["overallqual"] + rng.normal(0, 5000, 200)
+
+
+def test_cross_validate_models(tmpdir):
+    """
+    Test the cross_validate_models function to verify that every candidate is evaluated on every fold
+    and that the memory-mapped fold matrices are removed afterwards.
+    """
+
+    candidates = define_candidates(target_transformer=False)
+    folds = make_folds(data, n_splits=3)
+
+    model_results = cross_validate_models(data, candidates, folds, n_jobs=2, temp_folder=str(tmpdir))
+
+    assert set(model_results) == set(candidates)
+    for results in model_results.values():
+        assert len(results["fold_metrics"]) == len(folds)
+        assert set(results["test_metrics"]) == {"rmse", "mae", "r2", "max_error"}
+        assert results["test_metrics_std"]["rmse"] >= 0
+    assert os.listdir(tmpdir) == []  # Ensure shared files are cleaned up
+
+
+def test_cross_validate_models_n_jobs():
+    """
+    Test that the parallel evaluation gives the same results as the sequential one.
+    """
+
+    candidates = define_candidates(target_transformer=True)
+    candidates = {"LinearRegression": candidates["LinearRegression"]}
+    folds = make_folds(data, strategy="stratified", n_splits=3)
+
+    sequential = cross_validate_models(data, candidates, folds, n_jobs=1)
+    parallel = cross_validate_models(data, candidates, folds, n_jobs=2)
+
+    assert sequential["LinearRegression"]["test_metrics"] == parallel["LinearRegression"]["test_metrics"]
+
+
+def test_cross_validate_models_sparse():
+    """
+    Test that sparse preprocessing outputs are shared as CSR arrays and give the same results as dense ones.
+    """
+
+    dense = define_candidates(target_transformer=False)["LinearRegression"]
+    candidates = {"dense": dense,
+                  "sparse": clone(dense).set_params(preprocessor__sparse_threshold=1.0)}
+    folds = make_folds(data, n_splits=3)
+
+    with _shared_fold_matrices(data, candidates, folds, ["lotarea", "overallqual", "street"]) as fold_matrices:
+        assert set(fold_matrices["sparse"][0]["X_train"]) == {"data", "indices", "indptr", "shape"}
+        assert isinstance(fold_matrices["dense"][0]["X_train"], np.memmap)
+
+    model_results = cross_validate_models(data, candidates, folds, n_jobs=2)
+
+    assert model_results["sparse"]["test_metrics"] == pytest.approx(model_results["dense"]["test_metrics"])
+
+
+def test_benchmark_cross_validation():
+    """
+    Test the benchmark_cross_validation function to verify that one timing is reported per number of cores,
+    relative to the sequential run.
+    """
+
+    candidates = define_candidates(target_transformer=False)
+    folds = make_folds(data, n_splits=3)
+
+    benchmark = benchmark_cross_validation(data, candidates, folds, n_jobs_list=[2, 1])
+
+    assert list(benchmark["n_jobs"]) == [2, 1]
+    sequential = benchmark[benchmark["n_jobs"] == 1].iloc[0]
+    assert sequential["speedup"] == 1
+    assert sequential["efficiency"] <= 1
+    assert (benchmark["efficiency"] == benchmark["speedup"] / benchmark["workers"]).all()
+    assert (benchmark["seconds"] > 0).all()
+
+
+def test_benchmark_cross_validation_adds_sequential_run():
+    """
+    Test that a sequential run is timed as reference when it is not requested.
+    """
+
+    candidates = define_candidates(target_transformer=False)
+    folds = make_folds(data, n_splits=3)
+
+    benchmark = benchmark_cross_validation(data, candidates, folds, n_jobs_list=[2])
+
+    assert list(benchmark["n_jobs"]) == [1, 2]
@@ -1,5 +1,9 @@
 from ..src.utils import (filter_variables_by_completion_rate, 
                          split_dataset, 
+                         make_split,
+                         DatasetSplit,
+                         make_folds,
+                         select_features,
                          remove_single_modality_categorical_variables,
                          save_object_with_dill, save_dataset, 
                          load_dataset)
@@ -7,7 +11,9 @@ from ..src.utils import (filter_variables_by_completion_rate,
 from ..src.make_dataset import load_data
 from pathlib import Path
 import os
+import numpy as np
 import pandas as pd
+import pytest
 
 
 data = load_data("house_prices")
@@ -51,6 +57,84 @@ def test_split_dataset():
     assert X_train.shape[1] == X_test.shape[1]  # Ensure matching number of features
 
 
+def test_split_dataset_feature_order():
+    """
+    Test that split_dataset keeps the order of MODEL_PARAMS["FEATURES"] between calls.
+    """
+
+    X_train, X_test, _, _ = split_dataset(data)
+
+    assert list(X_train.columns) == select_features(data)
+    assert list(X_test.columns) == select_features(data)
+
+
+@pytest.mark.parametrize("strategy", ["random", "stratified", "time"])
+def test_make_split(strategy):
+    """
+    Test the make_split function to verify that train and test row positions are sorted,
+    disjoint and cover the whole dataset for every strategy.
+    """
+
+    split = make_split(data, strategy=strategy)
+
+    assert np.all(np.diff(split.train_index) > 0)
+    assert np.all(np.diff(split.test_index) > 0)
+    assert np.intersect1d(split.train_index, split.test_index).size == 0
+    assert split.train_index.size + split.test_index.size == data.shape[0]
+    assert split.X_train.shape == (split.train_index.size, len(split.features))
+    assert split.y_test.shape[0] == split.test_index.size
+
+
+def test_dataset_split_missing_feature():
+    """
+    Test that DatasetSplit raises a KeyError instead of silently selecting another column
+    when a feature is missing from the dataset.
+    """
+
+    split = make_split(data)
+
+    with pytest.raises(KeyError, match="missing_feature"):
+        DatasetSplit(data=data,
+                     features=split.features + ["missing_feature"],
+                     target=split.target,
+                     train_index=split.train_index,
+                     test_index=split.test_index)
+
+
+def test_make_split_time_strategy():
+    """
+    Test that the time strategy keeps the most recent sales in the test set.
+    """
+
+    split = make_split(data, strategy="time")
+    sale_date = data["yrsold"] * 12 + data["mosold"]
+
+    assert sale_date.iloc[split.train_index].max() <= sale_date.iloc[split.test_index].min()
+
+
+@pytest.mark.parametrize("strategy", ["random", "stratified"])
+def test_make_folds(strategy):
+    """
+    Test the make_folds function to verify that each repetition validates every row exactly once.
+    """
+
+    folds = make_folds(data, strategy=strategy, n_splits=5, n_repeats=2)
+
+    assert len(folds) == 10
+    for repeat in range(2):
+        test_index = np.concatenate([test for _, test in folds[repeat * 5:(repeat + 1) * 5]])
+        assert np.array_equal(np.sort(test_index), np.arange(data.shape[0]))
+
+
+def test_make_folds_invalid_strategy():
+    """
+    Test that make_folds raises a ValueError for an unrecognized strategy.
+    """
+
+    with pytest.raises(ValueError):
+        make_folds(data, strategy="invalid_strategy")
+
+
 def test_save_object_with_dill(tmpdir):
     """
     Test the save_object_with_dill function to verify if it properly saves an object using the dill module.